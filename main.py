@@ -1,11 +1,82 @@
-import json
-import pandas
+# -*- coding: utf-8 -*-
+"""
+在同一进程中爬取多个数据集, 共享一个浏览器和滑块验证求解器
+
+用法:
+python main.py                      # 爬取全部数据集
+python main.py hybrid               # 只爬取指定数据集
+python main.py electric:3 hybrid:1  # 两个数据集都有待爬数据时, 按 3 : 1 分配浏览器
+python main.py electric --excel-file electric=crawled_data/other.xlsx  # 覆盖数据集的文件路径
+"""
+import argparse
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+from miit_crawler.spiders.miit_spider import MiitSpider
+
+
+# 数据集名称 -> 爬虫参数, 每个数据集有独立的输出和进度文件
+# 电动数据集沿用已有的进度文件 miit_data.xlsx, 避免从第 1 条重新爬取
+DATASETS = {
+    'electric': {
+        'url_file': 'urls_electric.json',
+        'excel_file': 'crawled_data/miit_data.xlsx',
+    },
+    'hybrid': {
+        'url_file': 'urls_hybrid.json',
+        'excel_file': 'crawled_data/data_hybrid.xlsx',
+    },
+}
+
+
+def parse_jobs(parser, specs):
+    """
+    解析 name[:weight] 形式的数据集参数, 权重必须为正数
+    """
+    jobs = []
+    for spec in specs:
+        name, _, weight = spec.partition(':')
+        if name not in DATASETS:
+            parser.error(f"未知数据集: {name}, 可选: {', '.join(DATASETS)}")
+        try:
+            weight = float(weight) if weight else 1.0
+        except ValueError:
+            parser.error(f"数据集 {name} 的权重不是数字: {weight}")
+        if not weight > 0:
+            parser.error(f"数据集 {name} 的权重必须大于 0: {weight}")
+        jobs.append((name, weight))
+    return jobs
+
+
+def parse_overrides(parser, specs, option):
+    """
+    解析 name=path 形式的文件路径覆盖参数
+    """
+    overrides = {}
+    for spec in specs:
+        name, sep, path = spec.partition('=')
+        if name not in DATASETS or not sep or not path:
+            parser.error(f"{option} 参数格式应为 name=path, 可选数据集: {', '.join(DATASETS)}: {spec}")
+        overrides[name] = path
+    return overrides
+
 
 if __name__ == "__main__":
-    tag = [False for _ in range(37986)]
-    # 读取 miit_data.xlsx, 获取已经爬过的序号, tag 置为 True
-    df = pandas.read_excel('crawled_data/miit_data.xlsx')
-    for i in range(len(df)):
-        tag[df['序号'][i] - 1] = True
+    parser = argparse.ArgumentParser(description="在同一进程中爬取多个数据集")
+    parser.add_argument('datasets', nargs='*', default=list(DATASETS), help="数据集, 格式 name[:weight]")
+    parser.add_argument('--url-file', action='append', default=[], help="覆盖数据集的 URL 文件, 格式 name=path")
+    parser.add_argument('--excel-file', action='append', default=[], help="覆盖数据集的 Excel 文件, 格式 name=path")
+    args = parser.parse_args()
+
+    jobs = parse_jobs(parser, args.datasets)
+    url_files = parse_overrides(parser, args.url_file, '--url-file')
+    excel_files = parse_overrides(parser, args.excel_file, '--excel-file')
 
-    print(tag[:39])
\ No newline at end of file
+    process = CrawlerProcess(get_project_settings())
+    for name, weight in jobs:
+        kwargs = dict(DATASETS[name])
+        kwargs['url_file'] = url_files.get(name, kwargs['url_file'])
+        kwargs['excel_file'] = excel_files.get(name, kwargs['excel_file'])
+        process.crawl(MiitSpider, dataset=name, weight=weight, **kwargs)
+    process.start()
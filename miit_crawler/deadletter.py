@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import random
+import logging
+
+
+class DeadLetterQueue:
+    """
+    记录失败请求的持久化队列
+    每个失败的 URL 记录失败原因、尝试次数和下次重试时间, 按指数退避加随机抖动安排重试
+    超过最大尝试次数的 URL 转入永久失败列表, 不再重试
+    """
+
+    def __init__(self, file_path, max_attempts=5, base_delay=60, max_delay=3600):
+        self.logger = logging.getLogger(__name__)
+        self.file_path = file_path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        # url -> {number, reason, attempts, next_retry}
+        self.pending = {}
+        # url -> {number, reason, attempts}
+        self.failed = {}
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.file_path):
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.pending = data.get('pending', {})
+            self.failed = data.get('failed', {})
+            self.logger.info(f"读取失败队列 {self.file_path}: 待重试 {len(self.pending)} 条, 永久失败 {len(self.failed)} 条")
+
+    def save(self):
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 先写临时文件再替换, 避免中途退出导致文件损坏
+        tmp_file = f"{self.file_path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'pending': self.pending, 'failed': self.failed}, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_file, self.file_path)
+
+    def backoff(self, attempts):
+        """
+        计算第 attempts 次失败后的等待时间: 指数退避, 并加入 [0.5, 1.5) 倍随机抖动
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.5)
+
+    def record(self, url, number, reason):
+        """
+        记录一次失败
+        返回 True 表示仍会重试, False 表示已转入永久失败
+        """
+        entry = self.pending.pop(url, None) or {'number': number, 'attempts': 0}
+        entry['attempts'] += 1
+        entry['reason'] = reason
+
+        if entry['attempts'] >= self.max_attempts:
+            entry.pop('next_retry', None)
+            self.failed[url] = entry
+            self.save()
+            self.logger.error(f"第 {number} 条数据已失败 {entry['attempts']} 次, 不再重试: {url}, 原因: {reason}")
+            return False
+
+        delay = self.backoff(entry['attempts'])
+        entry['next_retry'] = time.time() + delay
+        self.pending[url] = entry
+        self.save()
+        self.logger.warning(f"第 {number} 条数据失败 {entry['attempts']} 次, {delay:.0f} 秒后重试: {url}, 原因: {reason}")
+        return True
+
+    def remove(self, url):
+        """
+        请求成功后移出队列
+        """
+        if self.pending.pop(url, None) is not None:
+            self.save()
+
+    def due(self, now=None):
+        """
+        返回已到重试时间的 (url, number) 列表
+        """
+        now = now or time.time()
+        return [(url, entry['number']) for url, entry in self.pending.items() if entry['next_retry'] <= now]
+
+    def next_retry_time(self):
+        """
+        最早的下次重试时间, 队列为空时返回 None
+        """
+        if not self.pending:
+            return None
+        return min(entry['next_retry'] for entry in self.pending.values())
@@ -9,3 +9,9 @@ class CaptchaRecognitionError(Exception):
     def __init__(self, message):
         super().__init__(message)
         self.message = message
+
+class AccessBannedError(CaptchaRecognitionError):
+    """访问行为被禁止, 当前出口身份需要冷却"""
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
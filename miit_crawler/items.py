@@ -45,4 +45,11 @@ class MiitCrawlerItem(scrapy.Item):
     reflective_mark_company = scrapy.Field()  # 反光标识企业
     other_info = scrapy.Field()  # 其他
     production_end_date = scrapy.Field()  # 停产日期
-    sales_end_date = scrapy.Field()  # 停售日期
\ No newline at end of file
+    sales_end_date = scrapy.Field()  # 停售日期
+
+class MiitUrlItem(scrapy.Item):
+    """
+    发现爬虫收集到的详情页 URL
+    """
+    url = scrapy.Field()  # 详情页 url (queryCpData?gid=...&pc=...)
+    batch = scrapy.Field()  # 批次
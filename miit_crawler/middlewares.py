@@ -13,39 +13,155 @@ from scrapy.http import HtmlResponse
 import requests
 from PIL import Image
 import numpy as np
+import cv2
 from captcha_recognizer.recognizer import Recognizer
 import random
+from twisted.internet import defer, threads
+from twisted.python.threadpool import ThreadPool
+from twisted.python.failure import Failure
 
-from miit_crawler.exceptions import CaptchaRecognitionError, ImageDownloadError
+from miit_crawler.exceptions import AccessBannedError, CaptchaRecognitionError, ImageDownloadError
 
 import os
+import shutil
+import threading
+import tempfile
+from collections import deque
+
+
+class OpenCVGapDetector:
+    """
+    基于OpenCV的滑块缺口检测
+    对背景图做边缘检测, 用不同尺寸的方框模板在边缘图上做模板匹配, 返回缺口位置及置信度
+    置信度为最高匹配峰值与其他横向位置上次高峰值的相对差距: 缺口唯一且清晰时约 0.4, 无明显缺口或有多个相似区域时接近 0
+    与识别模型一致, 返回框的左边界为整个拼图形状 (含左侧凸起) 的左边界
+    """
+
+    def __init__(self, min_size_ratio=0.1, max_size_ratio=0.25, size_step=4, knob_ratio=1 / 6, canny_low=100, canny_high=200):
+        self.logger = logging.getLogger(__name__)
+        # 缺口边长相对背景图宽度的取值范围
+        self.min_size_ratio = min_size_ratio
+        self.max_size_ratio = max_size_ratio
+        self.size_step = size_step
+        # 拼图凸起半径相对缺口边长的比例
+        self.knob_ratio = knob_ratio
+        self.canny_low = canny_low
+        self.canny_high = canny_high
+
+    def detect(self, image_file):
+        """
+        检测缺口位置
+
+        参数:
+        image_file: 背景图片文件路径
+
+        返回:
+        (box, confidence): box 为 [x1, y1, x2, y2], 未找到时为 None; confidence 取值 0~1
+        """
+        image = cv2.imread(image_file)
+        if image is None:
+            self.logger.warning(f"无法读取图片: {image_file}")
+            return None, 0.0
+        return self.detect_image(image)
+
+    def detect_image(self, image):
+        """
+        检测已读入的 BGR 图片中的缺口位置, 返回值同 detect
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        edges = cv2.Canny(blurred, self.canny_low, self.canny_high)
+        if not np.count_nonzero(edges):
+            return None, 0.0
+        # 膨胀边缘, 容忍模板尺寸与缺口尺寸的少量差异
+        edges = cv2.dilate(edges, np.ones((3, 3), np.uint8), iterations=1)
+
+        width = image.shape[1]
+        min_size = int(width * self.min_size_ratio)
+        max_size = min(int(width * self.max_size_ratio), image.shape[0])
+
+        # 在各尺寸的方框模板中找匹配峰值最高的一个
+        best = None
+        for size in range(min_size, max_size + 1, self.size_step):
+            template = np.zeros((size, size), np.uint8)
+            cv2.rectangle(template, (0, 0), (size - 1, size - 1), 255, 2)
+            result = cv2.matchTemplate(edges, template, cv2.TM_CCORR_NORMED)
+            _, peak, _, location = cv2.minMaxLoc(result)
+            if best is None or peak > best[0]:
+                best = (peak, location, size, result)
+
+        if best is None or best[0] <= 0:
+            return None, 0.0
+        peak, (x, y), size, result = best
+
+        # 排除最佳位置附近的列, 取其他横向位置的次高峰值
+        column_peaks = result.max(axis=0)
+        column_peaks[max(0, x - size // 2):x + size // 2 + 1] = 0
+        second_peak = float(column_peaks.max()) if column_peaks.size else 0.0
+
+        confidence = max(0.0, (peak - second_peak) / peak)
+
+        # 方框模板只匹配拼图主体, 左侧有凸起时左边界需扩展到凸起
+        if self._has_left_knob(gray, x, y, size):
+            x = max(0, x - int(round(size * self.knob_ratio)))
+        return [x, y, x + size, y + size], confidence
+
+    def _has_left_knob(self, gray, x, y, size):
+        """
+        判断缺口主体左侧是否有凸起
+        缺口区域带有阴影, 比较凸起位置与缺口内侧, 外侧背景的亮度, 更接近内侧时认为有凸起
+        """
+        radius = int(round(size * self.knob_ratio))
+        if radius < 2 or x - 2 * radius - 4 < 0:
+            return False
+        center_y = y + size // 2
+        rows = slice(max(0, center_y - radius // 2), center_y + radius // 2 + 1)
+        knob = np.median(gray[rows, x - radius + 1:x - 1])
+        inside = np.median(gray[rows, x + 3:x + 3 + radius])
+        outside = np.median(gray[rows, x - 2 * radius - 4:x - radius - 2])
+        return abs(knob - inside) < abs(knob - outside)
 
 
 class SliderCaptchaSolver:
-    def __init__(self):
+    def __init__(self, min_confidence=0.3, cv_enabled=True):
         self.logger = logging.getLogger(__name__)
-        self.recognizer = Recognizer()
+        # 先用OpenCV快速检测, 置信度不足时再回退到识别模型
+        self.gap_detector = OpenCVGapDetector() if cv_enabled else None
+        self.min_confidence = min_confidence
+        self._recognizer = None
+        # 多个出口身份的工作线程共用求解器
+        self._recognizer_lock = threading.Lock()
+
+    @property
+    def recognizer(self):
+        # 识别模型较重, 首次回退时才加载
+        with self._recognizer_lock:
+            if self._recognizer is None:
+                self._recognizer = Recognizer()
+        return self._recognizer
     
-    def download_image(self, image_url):
-        # 发送 GET 请求获取图片内容
-        response = requests.get(image_url)
+    def download_image(self, image_url, proxy=None, user_agent=None):
+        # 发送 GET 请求获取图片内容, 与浏览器使用同一出口
+        proxies = {'http': proxy, 'https': proxy} if proxy else None
+        headers = {'User-Agent': user_agent} if user_agent else None
+        response = requests.get(image_url, proxies=proxies, headers=headers)
 
         # 检查请求是否成功
         if response.status_code == 200:
-            # 获取图片的文件名
-            file_name = image_url.split('/')[-1]
+            # 获取图片的文件名, 加上线程名避免多个工作线程互相覆盖
+            file_name = f"{threading.current_thread().name}_{image_url.split('/')[-1]}"
             # 保存图片到本地
             with open(file_name, 'wb') as file:
                 file.write(response.content)
             self.logger.info(f"Successfully download picture {file_name}")
+            return file_name
         else:
             raise ImageDownloadError(f"Status code {response.status_code} while downloading {image_url}")
     
-    def get_slide_distance(self, bg_img_url, display_width):
+    def get_slide_distance(self, bg_img_url, display_width, proxy=None, user_agent=None):
         try:
             # 获取背景图片
-            self.download_image(bg_img_url)
-            bg_img_file = bg_img_url.split('/')[-1]
+            bg_img_file = self.download_image(bg_img_url, proxy, user_agent)
             
             # 获取页面上图片的显示尺寸和实际尺寸
             actual_width, _ = Image.open(bg_img_file).size
@@ -76,7 +192,17 @@ class SliderCaptchaSolver:
             self.logger.error(f"获取滑动距离时出错: {str(e)}")
             self.logger.error(traceback.format_exc())
             raise e
+
     def detect_puzzle_piece_boundary(self, image_file):
+        if self.gap_detector is not None:
+            start = time.perf_counter()
+            box, confidence = self.gap_detector.detect(image_file)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.logger.info(f"OpenCV缺口检测: {box}, 置信度: {confidence:.2f}, 耗时: {elapsed:.1f}ms")
+            if box is not None and confidence >= self.min_confidence:
+                return box
+            self.logger.info("OpenCV缺口检测置信度不足, 回退到识别模型")
+
         box, _ = self.recognizer.identify_gap(source=image_file)
         return box
     
@@ -164,6 +290,305 @@ class SliderCaptchaSolver:
         return track
 
 
+class EgressIdentity:
+    """
+    出口身份: 代理, 用户代理和独立的浏览器配置目录
+    记录请求速率和健康度, 被禁止访问后进入冷却, 并在冷却结束后使用全新的浏览器配置
+    """
+
+    def __init__(self, name, user_agent, proxy=None):
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.user_agent = user_agent
+        self.proxy = proxy
+
+        self.browser = None
+        self.profile_dir = None
+        # 每个身份一个工作线程, 同一时间只处理一个页面
+        self.worker = None
+        self.busy = False
+
+        # 统计信息
+        self.requests = 0
+        self.successes = 0
+        self.bans = 0
+        self.last_used = 0.0
+        self.cooldown_until = 0.0
+        # 最近一分钟内的请求时间, 用于计算速率
+        self.recent = deque()
+
+    def get_browser(self):
+        """
+        获取当前身份的浏览器, 首次使用或重置后创建
+        """
+        if self.browser is None:
+            self.profile_dir = tempfile.mkdtemp(prefix=f"miit_{self.name}_")
+
+            # 初始化Chrome选项
+            chrome_options = Options()
+            chrome_options.add_argument('--headless')
+            chrome_options.add_argument('--no-sandbox')
+            chrome_options.add_argument('--disable-dev-shm-usage')
+            chrome_options.add_argument('--disable-gpu')
+            chrome_options.add_argument('--window-size=1920,1080')
+            chrome_options.add_argument(f'--user-agent={self.user_agent}')
+            chrome_options.add_argument(f'--user-data-dir={self.profile_dir}')
+            if self.proxy:
+                chrome_options.add_argument(f'--proxy-server={self.proxy}')
+
+            self.browser = webdriver.Chrome(options=chrome_options)
+            self.logger.info(f"出口身份 {self.name} 的浏览器已初始化, 代理: {self.proxy or '直连'}")
+        return self.browser
+
+    def run(self, func, *args):
+        """
+        在当前身份的工作线程中执行 func, 返回结果的 Deferred
+        """
+        from twisted.internet import reactor
+
+        if self.worker is None:
+            self.worker = ThreadPool(minthreads=1, maxthreads=1, name=f"egress-{self.name}")
+            self.worker.start()
+        return threads.deferToThreadPool(reactor, self.worker, func, *args)
+
+    def close(self):
+        """
+        停止工作线程并关闭浏览器
+        """
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        self.reset()
+
+    def reset(self):
+        """
+        关闭浏览器并删除配置目录
+        """
+        if self.browser is not None:
+            self.browser.quit()
+            self.browser = None
+            self.logger.info(f"出口身份 {self.name} 的浏览器已关闭")
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+    def available_at(self, min_interval):
+        """
+        最早可以再次使用的时间
+        """
+        return max(self.cooldown_until, self.last_used + min_interval)
+
+    def health(self):
+        """
+        成功率 (平滑处理, 新身份为 0.5)
+        """
+        return (self.successes + 1) / (self.requests + 2)
+
+    def rate(self):
+        """
+        最近一分钟的请求数
+        """
+        now = time.time()
+        while self.recent and self.recent[0] < now - 60:
+            self.recent.popleft()
+        return len(self.recent)
+
+    def mark_used(self):
+        now = time.time()
+        self.requests += 1
+        self.last_used = now
+        self.recent.append(now)
+
+    def ban(self, cooldown):
+        """
+        访问被禁止后进入冷却, 丢弃当前浏览器配置
+        关闭浏览器较慢, 由浏览器池在工作线程中调用
+        """
+        self.bans += 1
+        self.cooldown_until = time.time() + cooldown
+        self.logger.warning(f"出口身份 {self.name} 访问被禁止 (第 {self.bans} 次), 冷却 {cooldown} 秒")
+        self.reset()
+
+
+class BrowserPool:
+    """
+    进程内共享的浏览器和滑块验证求解器
+    同一进程中的多个爬虫 (数据集) 共用出口身份池和识别模型, 按权重公平分配浏览器使用次数
+    每个请求按轮询或健康度分配给一个可用的出口身份
+    """
+    _shared = None
+
+    def __init__(self, settings):
+        self.logger = logging.getLogger(__name__)
+
+        # 初始化出口身份, 未配置时使用一个直连身份
+        identities = settings.get('EGRESS_IDENTITIES') or [{}]
+        self.identities = [
+            EgressIdentity(
+                name=config.get('name', f"identity{i}"),
+                user_agent=config.get('user_agent', settings.get('USER_AGENT')),
+                proxy=config.get('proxy'),
+            )
+            for i, config in enumerate(identities)
+        ]
+        self.strategy = settings.get('EGRESS_STRATEGY', 'round_robin')
+        if self.strategy not in ('round_robin', 'health'):
+            raise ValueError(f"未知的出口身份分配策略: {self.strategy}")
+        self.min_interval = settings.getfloat('EGRESS_MIN_INTERVAL', 0)
+        self.ban_cooldown = settings.getfloat('EGRESS_BAN_COOLDOWN', 600)
+        self._next_index = 0
+        # 等待出口身份可用的定时调度
+        self._dispatch_call = None
+        
+        # 初始化滑块验证求解器
+        self.captcha_solver = SliderCaptchaSolver(
+            min_confidence=settings.getfloat('CAPTCHA_CV_MIN_CONFIDENCE', 0.3),
+            cv_enabled=settings.getbool('CAPTCHA_CV_ENABLED', True),
+        )
+
+        # 数据集 -> 权重 / 已处理请求数 / 等待中的任务
+        self.weights = {}
+        self.served = {}
+        self.waiting = {}
+
+    def _select_identity(self):
+        """
+        选择一个空闲且可用的出口身份
+        返回 (identity, 0); 没有可用身份时返回 (None, 需要等待的秒数),
+        所有身份都在处理页面时等待时间为 None, 由页面处理完成时重新调度
+        """
+        now = time.time()
+        idle = [identity for identity in self.identities if not identity.busy]
+        if not idle:
+            return None, None
+        ready = [identity for identity in idle if identity.available_at(self.min_interval) <= now]
+        if not ready:
+            return None, min(identity.available_at(self.min_interval) for identity in idle) - now
+
+        if self.strategy == 'health':
+            # 成功率最高者优先, 相同时选择最久未使用的
+            return max(ready, key=lambda identity: (identity.health(), -identity.last_used)), 0
+
+        # 轮询: 从上次位置之后找第一个可用身份
+        count = len(self.identities)
+        for offset in range(count):
+            index = (self._next_index + offset) % count
+            if self.identities[index] in ready:
+                self._next_index = index + 1
+                return self.identities[index], 0
+
+    @classmethod
+    def acquire(cls, settings):
+        """
+        获取共享实例, 首次调用时创建
+        """
+        if cls._shared is None:
+            cls._shared = cls(settings)
+        return cls._shared
+
+    def register(self, dataset, weight=1.0):
+        if weight <= 0:
+            raise ValueError(f"数据集 {dataset} 的权重必须大于 0: {weight}")
+        if not self.weights:
+            served = 0
+        else:
+            # 新加入的数据集从当前最小份额开始, 避免长时间独占浏览器
+            served = min(self.served[n] / self.weights[n] for n in self.weights) * weight
+        self.weights[dataset] = weight
+        self.served[dataset] = served
+        self.waiting[dataset] = []
+        self.logger.info(f"数据集 {dataset} 加入浏览器池, 权重: {weight}")
+
+    def unregister(self, dataset):
+        """
+        数据集结束后移出; 所有数据集结束时关闭浏览器
+        """
+        self.weights.pop(dataset, None)
+        self.served.pop(dataset, None)
+        self.waiting.pop(dataset, None)
+        if not self.weights:
+            if self._dispatch_call is not None and self._dispatch_call.active():
+                self._dispatch_call.cancel()
+            for identity in self.identities:
+                self.logger.info(f"出口身份 {identity.name}: 请求 {identity.requests} 次, 成功 {identity.successes} 次, 被禁止 {identity.bans} 次")
+                identity.close()
+            BrowserPool._shared = None
+
+    def submit(self, dataset, func):
+        """
+        提交一个使用浏览器的任务, 返回任务完成时触发的 Deferred
+        func 在分配到的出口身份的工作线程中以 func(identity) 的形式调用
+        """
+        d = defer.Deferred()
+        self.waiting[dataset].append((func, d))
+        self._schedule_dispatch(0)
+        return d
+
+    def _schedule_dispatch(self, delay):
+        """
+        在 delay 秒后调度; 已有更早的调度时不重复安排
+        """
+        from twisted.internet import reactor
+
+        if self._dispatch_call is not None and self._dispatch_call.active():
+            if self._dispatch_call.getTime() <= reactor.seconds() + delay:
+                return
+            self._dispatch_call.cancel()
+        self._dispatch_call = reactor.callLater(delay, self._dispatch)
+
+    def _next_job(self):
+        """
+        在有等待任务的数据集中选出 已处理数 / 权重 最小的一个, 取出其最早的任务
+        每个数据集可同时排队多个任务 (CONCURRENT_REQUESTS), 因此各数据集占用浏览器的比例趋近于权重之比
+        """
+        candidates = [n for n, jobs in self.waiting.items() if jobs]
+        dataset = min(candidates, key=lambda n: self.served[n] / self.weights[n])
+        func, d = self.waiting[dataset].pop(0)
+        self.served[dataset] += 1
+        return dataset, func, d
+
+    def _dispatch(self):
+        """
+        为等待中的任务分配空闲的出口身份, 每个身份在自己的工作线程中处理页面
+        """
+        self._dispatch_call = None
+        while any(self.waiting.values()):
+            identity, wait = self._select_identity()
+            if identity is None:
+                if wait is not None:
+                    # 空闲身份都在冷却或限速中, 稍后再试
+                    self._schedule_dispatch(wait)
+                return
+
+            dataset, func, d = self._next_job()
+            identity.busy = True
+            identity.mark_used()
+            self.logger.info(f"数据集 {dataset} 使用出口身份 {identity.name}, 最近一分钟请求 {identity.rate()} 次")
+            identity.run(func, identity).addBoth(self._finished, identity, d)
+
+    def _finished(self, result, identity, d):
+        """
+        页面处理完成: 更新身份统计, 被禁止访问时在工作线程中冷却并重置浏览器, 然后释放身份
+        """
+        if isinstance(result, Failure) and result.check(AccessBannedError):
+            released = identity.run(identity.ban, self.ban_cooldown)
+        else:
+            if not isinstance(result, Failure):
+                identity.successes += 1
+            released = defer.succeed(None)
+        released.addErrback(lambda failure: self.logger.error(f"重置出口身份 {identity.name} 失败: {failure.getErrorMessage()}"))
+        released.addBoth(self._release, identity)
+
+        if isinstance(result, Failure):
+            d.errback(result)
+        else:
+            d.callback(result)
+
+    def _release(self, _, identity):
+        identity.busy = False
+        self._schedule_dispatch(0)
+
+
 class SeleniumMiddleware(object):
     """
     优化的Scrapy中间件, 用于处理滑块验证
@@ -173,30 +598,26 @@ class SeleniumMiddleware(object):
         super(SeleniumMiddleware, self).__init__()
         self.logger = logging.getLogger(__name__)
         
-        # 初始化Chrome选项
-        self.chrome_options = Options()
-        self.chrome_options.add_argument('--headless')
-        self.chrome_options.add_argument('--no-sandbox')
-        self.chrome_options.add_argument('--disable-dev-shm-usage')
-        self.chrome_options.add_argument('--disable-gpu')
-        self.chrome_options.add_argument('--window-size=1920,1080')
-        
-        # 设置用户代理
-        self.chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.2 Safari/605.1.15')
-        
-        # 初始化浏览器
-        self.browser = webdriver.Chrome(options=self.chrome_options)
-        self.logger.info("Selenium浏览器已初始化")
-        
-        # 初始化滑块验证求解器
-        self.captcha_solver = SliderCaptchaSolver()
+        # 同一进程中的爬虫共享浏览器和滑块验证求解器
+        self.pool = BrowserPool.acquire(crawler.settings)
+
+        # 只从浏览器取回详情表格和车辆图片, 不传输整个页面
+        self.lean_response = crawler.settings.getbool('LEAN_RESPONSE', False)
         
-        # 关联信号，确保爬虫关闭时关闭浏览器
+        # 关联信号, 确保爬虫启动时加入浏览器池, 关闭时退出
+        crawler.signals.connect(self.spider_opened, signal=signals.spider_opened)
         crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+
+    @property
+    def captcha_solver(self):
+        return self.pool.captcha_solver
+
+    def _dataset(self, spider):
+        return getattr(spider, 'dataset', spider.name)
     
-    def clear_cache(self):
-        self.browser.execute_script("window.sessionStorage.clear();")
-        self.browser.execute_script("window.localStorage.clear();")
+    def clear_cache(self, browser):
+        browser.execute_script("window.sessionStorage.clear();")
+        browser.execute_script("window.localStorage.clear();")
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -204,41 +625,53 @@ class SeleniumMiddleware(object):
 
     def process_request(self, request, spider):
         """
-        处理包含滑块验证的请求
+        排队等待共享浏览器, 轮到时处理请求
+        """
+        return self.pool.submit(self._dataset(spider), lambda identity: self._render(request, identity))
+
+    def _render(self, request, identity):
+        """
+        使用给定出口身份的浏览器处理包含滑块验证的请求, 在该身份的工作线程中执行
         """
+        browser = identity.get_browser()
         self.logger.info(f"使用Selenium处理请求: {request.url}")
         
         # 访问页面
-        self.browser.get(request.url)
+        browser.get(request.url)
             
         self.logger.info(f"开始处理滑块验证...")
         try:
             # 等待滑块, 继续访问按钮和验证码背景图片加载
-            slider = WebDriverWait(self.browser, 5).until(
+            slider = WebDriverWait(browser, 5).until(
                 EC.presence_of_element_located((By.CLASS_NAME, "yidun_slider"))
             )
-            submit_button = WebDriverWait(self.browser, 3).until(
+            submit_button = WebDriverWait(browser, 3).until(
                 EC.element_to_be_clickable((By.ID, "submit-btn"))
             )
-            bg_img_element = WebDriverWait(self.browser, 3).until(
+            bg_img_element = WebDriverWait(browser, 3).until(
                 lambda driver: driver.find_element(By.CLASS_NAME, "yidun_bg-img")
             )
             
             self.logger.info("滑块, 提交按钮和验证码图片已加载")
 
-            WebDriverWait(self.browser, 3).until(
+            WebDriverWait(browser, 3).until(
                 lambda driver: bg_img_element.get_attribute("src") is not None
             )
             bg_img_url = bg_img_element.get_attribute("src")
             
             # 计算滑动距离
-            distance = self.captcha_solver.get_slide_distance(bg_img_url, bg_img_element.size["width"])
+            distance = self.captcha_solver.get_slide_distance(
+                bg_img_url,
+                bg_img_element.size["width"],
+                proxy=identity.proxy,
+                user_agent=identity.user_agent,
+            )
             self.logger.info(f"滑动距离: {distance}像素")
 
             track = [distance]
             
             # 执行滑动操作
-            action = ActionChains(self.browser)
+            action = ActionChains(browser)
             action.click_and_hold(slider)
             for step in track:
                 action.move_by_offset(step, 0)
@@ -258,19 +691,26 @@ class SeleniumMiddleware(object):
         self.logger.info("已点击提交按钮")
 
         # 等待页面加载完成
-        WebDriverWait(self.browser, 3).until(
+        WebDriverWait(browser, 3).until(
             EC.presence_of_element_located((By.TAG_NAME, "body"))
         )
         
         # 获取最终页面内容
-        body = self.browser.page_source
-        current_url = self.browser.current_url
+        body = self._lean_page_source(browser) if self.lean_response else None
+        if body is None:
+            body = browser.page_source
+        current_url = browser.current_url
 
         if "访问行为被禁止" in body:
-            self.logger.error("滑块验证失败")
+            self.logger.error(f"访问行为被禁止, 出口身份: {identity.name}")
+            raise AccessBannedError("访问行为被禁止")
+
+        # 仍在验证页面: 滑块验证失败, 计入当前出口身份的失败次数
+        if "访问行为验证" in body:
+            self.logger.error(f"滑块验证失败, 仍在验证页面, 出口身份: {identity.name}")
             raise CaptchaRecognitionError("滑块验证失败")
         
-        self.clear_cache()
+        self.clear_cache(browser)
 
         # 返回Response对象
         return HtmlResponse(
@@ -280,9 +720,38 @@ class SeleniumMiddleware(object):
             request=request
         )
 
-    def download_car_image(self):
+    def _lean_page_source(self, browser):
+        """
+        在浏览器中只序列化详情表格和 getPic 图片节点, 拼成精简的 HTML
+        仍处于验证页面或访问被禁止时返回 None, 由调用方回退到完整页面
+        """
+        lean_js = """
+        var text = document.body ? document.body.textContent : '';
+        if (text.indexOf('访问行为被禁止') !== -1 || text.indexOf('访问行为验证') !== -1) {
+            return null;
+        }
+        var parts = [];
+        document.querySelectorAll('table').forEach(function (table) {
+            // 只取最外层表格, 嵌套表格已包含在其中
+            if (!table.parentElement || !table.parentElement.closest('table')) {
+                parts.push(table.outerHTML);
+            }
+        });
+        document.querySelectorAll('img[src^="getPic"]').forEach(function (img) {
+            if (!img.closest('table')) {
+                parts.push(img.outerHTML);
+            }
+        });
+        return '<html><body>' + parts.join('') + '</body></html>';
+        """
+        body = browser.execute_script(lean_js)
+        if body is not None:
+            self.logger.info(f"精简页面内容: {len(body)} 字符")
+        return body
+
+    def download_car_image(self, browser):
         # 找到所有的img元素
-        img_elements = self.browser.find_elements(By.TAG_NAME, "img")
+        img_elements = browser.find_elements(By.TAG_NAME, "img")
         self.logger.info(f"找到 {len(img_elements)} 个图片元素")
         
         # 准备保存图片的目录
@@ -309,7 +778,7 @@ class SeleniumMiddleware(object):
             """
             
             # 执行JavaScript获取图片数据
-            img_data_url = self.browser.execute_script(canvas_js, img)
+            img_data_url = browser.execute_script(canvas_js, img)
 
             # 如果成功获取到图片数据
             if img_data_url and img_data_url.startswith('data:image/'):
@@ -351,10 +820,14 @@ class SeleniumMiddleware(object):
         
         return images
             
+    def spider_opened(self, spider):
+        """
+        爬虫启动时按权重加入浏览器池
+        """
+        self.pool.register(self._dataset(spider), float(getattr(spider, 'weight', 1.0)))
+
     def spider_closed(self, spider):
         """
-        爬虫关闭时关闭浏览器
+        爬虫关闭时退出浏览器池, 最后一个爬虫关闭时关闭浏览器
         """
-        if self.browser:
-            self.browser.quit()
-            self.logger.info("Selenium浏览器已关闭")
\ No newline at end of file
+        self.pool.unregister(self._dataset(spider))
@@ -3,6 +3,7 @@ import json
 import os
 from datetime import datetime
 import pandas as pd
+from scrapy.exceptions import DropItem
 
 
 class MiitCrawlerJSONPipeline:
@@ -178,4 +179,49 @@ class MiitCrawlerExcelPipeline:
         """
         if self.data:
             spider.logger.info(f"爬虫关闭, 写入剩余 {len(self.data)} 条数据到Excel")
-            self._write_to_excel(spider)
\ No newline at end of file
+            self._write_to_excel(spider)
+
+
+class MiitUrlFrontierPipeline:
+    """
+    将发现爬虫收集到的新 URL 追加到 URL 文件
+    已存在的 URL 被丢弃, 原有 URL 的顺序 (即序号) 保持不变
+    """
+    def open_spider(self, spider):
+        """
+        在爬虫启动时读取已有 URL
+        """
+        self.url_file = spider.url_file
+        if os.path.exists(self.url_file):
+            with open(self.url_file, 'r') as f:
+                self.urls = json.load(f)
+        else:
+            self.urls = []
+        self.known_urls = set(self.urls)
+        self.new_count = 0
+        spider.logger.info(f"URL文件 {self.url_file} 中已有 {len(self.urls)} 条URL")
+
+    def process_item(self, item, spider):
+        """
+        新 URL 追加到列表末尾
+        """
+        url = item.get('url')
+        if url in self.known_urls:
+            raise DropItem(f"URL已存在: {url}")
+
+        self.known_urls.add(url)
+        self.urls.append(url)
+        self.new_count += 1
+        return item
+
+    def close_spider(self, spider):
+        """
+        爬虫关闭时写回 URL 文件
+        """
+        if not self.new_count:
+            spider.logger.info("没有发现新的URL")
+            return
+
+        with open(self.url_file, 'w') as f:
+            json.dump(self.urls, f, indent=4)
+        spider.logger.info(f"新增 {self.new_count} 条URL, URL文件 {self.url_file} 总数: {len(self.urls)}")
@@ -12,10 +12,13 @@ USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 ROBOTSTXT_OBEY = False
 
 # Configure maximum concurrent requests performed by Scrapy (default: 16)
-CONCURRENT_REQUESTS = 1
+# 请求在浏览器池中排队, 由浏览器池控制实际访问速率 (见 EGRESS_MIN_INTERVAL);
+# 每个数据集保持多个排队请求, 多数据集时才能按权重分配浏览器;
+# 每个出口身份同时处理一个页面, 应不少于 EGRESS_IDENTITIES 的数量
+CONCURRENT_REQUESTS = 8
 
 # Configure a delay for requests for the same website (default: 0)
-DOWNLOAD_DELAY = 5
+DOWNLOAD_DELAY = 0
 # The download delay setting will honor only one of:
 #CONCURRENT_REQUESTS_PER_DOMAIN = 16
 #CONCURRENT_REQUESTS_PER_IP = 16
@@ -62,11 +65,42 @@ LOG_LEVEL = 'INFO'
 LOG_FORMAT = '%(asctime)s [%(name)s] %(levelname)s: %(message)s'
 LOG_DATEFORMAT = '%Y-%m-%d %H:%M:%S'
 
-# 启用自动限速
-AUTOTHROTTLE_ENABLED = True
+# 自动限速会把浏览器池中的排队时间当作响应延迟, 访问速率改由浏览器池控制
+AUTOTHROTTLE_ENABLED = False
 AUTOTHROTTLE_START_DELAY = 5
 AUTOTHROTTLE_MAX_DELAY = 60
 AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
 
 # 设置下载超时
-DOWNLOAD_TIMEOUT = 180
\ No newline at end of file
+DOWNLOAD_TIMEOUT = 180
+# 滑块缺口检测: 优先使用OpenCV, 置信度低于阈值时回退到识别模型
+# 清晰的单个缺口置信度约 0.4, 无缺口或多个相似区域时低于 0.1
+CAPTCHA_CV_ENABLED = True
+CAPTCHA_CV_MIN_CONFIDENCE = 0.3
+
+# 失败队列: 验证失败, 访问被禁止, 超时的请求按指数退避重试
+DEADLETTER_MAX_ATTEMPTS = 5
+DEADLETTER_BASE_DELAY = 60
+DEADLETTER_MAX_DELAY = 3600
+# 空闲时最多等待多少秒等待下一次重试, 更晚的重试留给下次运行
+DEADLETTER_MAX_WAIT = 600
+# 起始请求之间检查到期重试的最小间隔 (秒)
+DEADLETTER_CHECK_INTERVAL = 5
+
+# 出口身份池: 每个身份使用独立的代理, 用户代理和浏览器配置目录, 在各自的工作线程中并行处理页面
+# 未配置时使用一个直连身份, 用户代理取 USER_AGENT
+# 例: EGRESS_IDENTITIES = [
+#     {'name': 'proxy1', 'proxy': 'http://127.0.0.1:8081'},
+#     {'name': 'proxy2', 'proxy': 'http://127.0.0.1:8082', 'user_agent': 'Mozilla/5.0 ...'},
+# ]
+EGRESS_IDENTITIES = []
+# 分配策略: round_robin (轮询) 或 health (按成功率)
+EGRESS_STRATEGY = 'round_robin'
+# 同一身份两次请求的最小间隔 (秒)
+EGRESS_MIN_INTERVAL = 5
+# 访问行为被禁止后, 该身份的冷却时间 (秒)
+EGRESS_BAN_COOLDOWN = 600
+
+# 只从浏览器取回详情表格和车辆图片节点, 减少 WebDriver 传输和解析开销
+# 页面仍为验证页或访问被禁止时自动回退到完整页面
+LEAN_RESPONSE = False
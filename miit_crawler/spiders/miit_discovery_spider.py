@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import json
+import logging
+from urllib.parse import urlparse
+
+import scrapy
+
+from ..items import MiitUrlItem
+
+
+class MiitDiscoverySpider(scrapy.Spider):
+    """
+    按批次遍历公告列表页, 发现新的详情页 URL 并追加到 URL 文件
+
+    用法:
+    scrapy crawl miit_discovery_spider -a url_file=urls_electric.json -a state_file=discovery_electric.json \
+        -a listing_url='https://.../queryCpList?dataTag=Z&pc={batch}&page={page}'
+    """
+    name = 'miit_discovery_spider'
+
+    custom_settings = {
+        # 列表页不需要滑块验证, 不启动浏览器
+        'DOWNLOADER_MIDDLEWARES': {
+            'miit_crawler.middlewares.SeleniumMiddleware': None,
+        },
+        'ITEM_PIPELINES': {
+            'miit_crawler.pipelines.MiitUrlFrontierPipeline': 300,
+        },
+        # 列表页请求不经过浏览器池, 需要 Scrapy 自己限速
+        'DOWNLOAD_DELAY': 5,
+        'AUTOTHROTTLE_ENABLED': True,
+    }
+
+    detail_url_pattern = re.compile(r'queryCpData\?(?=.*gid=)(?=.*pc=\d+)')
+    batch_pattern = re.compile(r'[?&]pc=(\d+)')
+
+    def __init__(self, *args, **kwargs):
+        super(MiitDiscoverySpider, self).__init__(*args, **kwargs)
+        self.logger.setLevel(logging.INFO)
+        self.url_file = kwargs.get('url_file')
+        if self.url_file is None:
+            raise ValueError("未指定URL文件路径")
+        self.state_file = kwargs.get('state_file')
+        if self.state_file is None:
+            raise ValueError("未指定状态文件路径")
+        self.listing_url = kwargs.get('listing_url')
+        if self.listing_url is None or '{batch}' not in self.listing_url or '{page}' not in self.listing_url:
+            raise ValueError("未指定列表页URL模板, 需包含 {batch} 和 {page}")
+        self.allowed_domains = [urlparse(self.listing_url.format(batch=0, page=1)).hostname]
+
+        # 连续多少个批次没有数据时停止
+        self.max_empty_batches = int(kwargs.get('max_empty_batches', 2))
+
+        self.last_batch = self._load_last_batch()
+        self.batch_urls = set()
+        if kwargs.get('start_batch') is not None:
+            self.last_batch = int(kwargs.get('start_batch')) - 1
+
+    def _load_last_batch(self):
+        """
+        读取上次已完整扫描的批次
+        没有状态文件时, 以 URL 文件中最大的批次号 (pc=) 为起点, 避免从第 1 批重新扫描
+        """
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as f:
+                return json.load(f).get('last_batch', 0)
+        if os.path.exists(self.url_file):
+            with open(self.url_file, 'r') as f:
+                batches = [int(match.group(1)) for match in map(self.batch_pattern.search, json.load(f)) if match]
+            if batches:
+                self.logger.info(f"没有状态文件, 从URL文件中的最大批次 {max(batches)} 之后开始")
+                return max(batches)
+        return 0
+
+    def _save_last_batch(self):
+        with open(self.state_file, 'w') as f:
+            json.dump({'last_batch': self.last_batch}, f)
+        self.logger.info(f"已记录最后扫描批次: {self.last_batch}")
+
+    def _listing_request(self, batch, page, empty_batches=0):
+        return scrapy.Request(
+            url=self.listing_url.format(batch=batch, page=page),
+            callback=self.parse,
+            meta={'batch': batch, 'page': page, 'empty_batches': empty_batches},
+            dont_filter=True,
+        )
+
+    def start_requests(self):
+        """
+        从上次扫描批次的下一批开始
+        """
+        batch = self.last_batch + 1
+        self.logger.info(f"从第 {batch} 批开始扫描")
+        yield self._listing_request(batch, 1)
+
+    def parse(self, response):
+        """
+        解析列表页, 提取详情页 URL, 并按页码和批次继续遍历
+        """
+        batch = response.meta['batch']
+        page = response.meta['page']
+        empty_batches = response.meta['empty_batches']
+
+        if page == 1:
+            # 本批次已发现的 URL
+            self.batch_urls = set()
+
+        # 只保留本批次尚未出现过的 URL; 页码超出范围时部分站点会重复返回最后一页
+        detail_urls = []
+        for href in response.css('a::attr(href)').getall():
+            if self.detail_url_pattern.search(href):
+                url = response.urljoin(href)
+                if url not in self.batch_urls:
+                    self.batch_urls.add(url)
+                    detail_urls.append(url)
+
+        self.logger.info(f"第 {batch} 批第 {page} 页: 发现 {len(detail_urls)} 条新详情页")
+
+        for url in detail_urls:
+            item = MiitUrlItem()
+            item['url'] = url
+            item['batch'] = batch
+            yield item
+
+        if detail_urls:
+            # 当前批次还有新数据, 继续下一页
+            yield self._listing_request(batch, page + 1)
+            return
+
+        if page > 1:
+            # 当前批次扫描完毕
+            self.last_batch = batch
+            yield self._listing_request(batch + 1, 1)
+            return
+
+        # 当前批次没有任何数据
+        empty_batches += 1
+        if empty_batches < self.max_empty_batches:
+            yield self._listing_request(batch + 1, 1, empty_batches)
+        else:
+            self.logger.info(f"连续 {empty_batches} 个批次没有数据, 停止扫描")
+
+    def closed(self, reason):
+        """
+        爬虫关闭时记录最后扫描批次
+        """
+        self._save_last_batch()
@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 import os
-from unittest import signals
+import time
 import scrapy
 import logging
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
 from ..items import MiitCrawlerItem
 
 from miit_crawler.exceptions import CaptchaRecognitionError
+from miit_crawler.deadletter import DeadLetterQueue
 import json
 
 import pandas
@@ -26,6 +29,85 @@ class MiitSpider(scrapy.Spider):
             raise ValueError("未指定URL文件路径")
         with open(self.url_file, 'r') as f:
             self.start_urls = json.load(f)
+        # 数据集名称和权重, 多个数据集共享浏览器时按权重分配
+        self.dataset = kwargs.get('dataset') or os.path.splitext(os.path.basename(self.excel_file))[0]
+        self.weight = float(kwargs.get('weight', 1.0))
+        if not self.weight > 0:
+            raise ValueError(f"数据集权重必须大于 0: {self.weight}")
+        self.dead_letter_file = kwargs.get('dead_letter_file') or f"{os.path.splitext(self.excel_file)[0]}_deadletter.json"
+        # 正在重试中的 URL
+        self.retrying = set()
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(MiitSpider, cls).from_crawler(crawler, *args, **kwargs)
+        spider.dead_letters = DeadLetterQueue(
+            spider.dead_letter_file,
+            max_attempts=crawler.settings.getint('DEADLETTER_MAX_ATTEMPTS', 5),
+            base_delay=crawler.settings.getfloat('DEADLETTER_BASE_DELAY', 60),
+            max_delay=crawler.settings.getfloat('DEADLETTER_MAX_DELAY', 3600),
+        )
+        spider.max_retry_wait = crawler.settings.getfloat('DEADLETTER_MAX_WAIT', 600)
+        spider.retry_check_interval = crawler.settings.getfloat('DEADLETTER_CHECK_INTERVAL', 5)
+        spider.last_retry_check = 0.0
+        crawler.signals.connect(spider.spider_error, signal=signals.spider_error)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        return spider
+
+    def _detail_request(self, url, number, retry=False):
+        return scrapy.Request(
+            url=url,
+            callback=self.parse,
+            errback=self.request_failed,
+            meta={'number': number},
+            dont_filter=retry,
+        )
+
+    def _due_retries(self):
+        """
+        失败队列中已到重试时间的请求
+        """
+        self.last_retry_check = time.time()
+        for url, number in self.dead_letters.due():
+            if url in self.retrying:
+                continue
+            self.retrying.add(url)
+            self.logger.info(f"重试第 {number} 条数据: {url}")
+            yield self._detail_request(url, number, retry=True)
+
+    def _record_failure(self, request, reason):
+        self.retrying.discard(request.url)
+        self.dead_letters.record(request.url, request.meta['number'], reason)
+
+    def request_failed(self, failure):
+        """
+        下载阶段失败 (滑块验证失败, 访问被禁止, 等待超时等), 记入失败队列
+        """
+        self._record_failure(failure.request, f"{failure.type.__name__}: {failure.getErrorMessage()}")
+
+    def spider_error(self, failure, response, spider):
+        """
+        解析阶段失败, 记入失败队列
+        """
+        if spider is not self:
+            return
+        self._record_failure(response.request, f"{failure.type.__name__}: {failure.getErrorMessage()}")
+
+    def spider_idle(self, spider):
+        """
+        空闲时投递到期的重试请求; 若最近的重试在等待上限内, 保持爬虫运行
+        """
+        if spider is not self:
+            return
+        requests = list(self._due_retries())
+        for request in requests:
+            self.crawler.engine.crawl(request)
+        if requests:
+            raise DontCloseSpider
+
+        next_retry = self.dead_letters.next_retry_time()
+        if next_retry is not None and next_retry - time.time() <= self.max_retry_wait:
+            raise DontCloseSpider
     
     def start_requests(self):
         """
@@ -46,8 +128,16 @@ class MiitSpider(scrapy.Spider):
         for i, url in enumerate(self.start_urls):
             if tag[i]:
                 continue
+            # 失败队列中的 URL 由重试调度投递, 永久失败的不再抓取
+            if url in self.dead_letters.pending or url in self.dead_letters.failed:
+                continue
+            # 遍历失败队列开销与队列长度成正比, 间隔一段时间才检查一次
+            if time.time() - self.last_retry_check >= self.retry_check_interval:
+                yield from self._due_retries()
             self.logger.info(f"开始抓取第 {i + 1} 条数据: {url}")
-            yield scrapy.Request(url=url, callback=self.parse, meta={'number': i + 1})
+            yield self._detail_request(url, i + 1)
+
+        yield from self._due_retries()
     
     def parse(self, response):
         """
@@ -60,6 +150,8 @@ class MiitSpider(scrapy.Spider):
             raise CaptchaRecognitionError("滑块验证失败")
             
         self.logger.info("成功获取内容页面，开始解析...")
+        self.retrying.discard(response.request.url)
+        self.dead_letters.remove(response.request.url)
         
         # 创建Item
         item = MiitCrawlerItem()
@@ -111,4 +203,15 @@ class MiitSpider(scrapy.Spider):
         item['production_end_date'] = response.xpath('//tr/td[contains(text(), "停产日期")]/following-sibling::td/span/text()').get('').strip()
         item['sales_end_date'] = response.xpath('//tr/td[contains(text(), "停售日期")]/following-sibling::td/span/text()').get('').strip()
         
-        yield item
\ No newline at end of file
+        yield item
+
+    def closed(self, reason):
+        """
+        爬虫关闭时单独报告永久失败的数据
+        """
+        if self.dead_letters.failed:
+            self.logger.error(f"共 {len(self.dead_letters.failed)} 条数据永久失败, 详见 {self.dead_letter_file}")
+            for url, entry in self.dead_letters.failed.items():
+                self.logger.error(f"第 {entry['number']} 条: {url}, 尝试 {entry['attempts']} 次, 原因: {entry['reason']}")
+        if self.dead_letters.pending:
+            self.logger.info(f"共 {len(self.dead_letters.pending)} 条数据待下次运行重试")
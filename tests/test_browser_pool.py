@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import argparse
+
+import pytest
+from scrapy.settings import Settings
+
+import main
+from miit_crawler.middlewares import BrowserPool
+
+
+def make_pool(**overrides):
+    settings = Settings({'USER_AGENT': 'test-agent', 'EGRESS_MIN_INTERVAL': 0})
+    settings.setdict(overrides)
+    return BrowserPool(settings)
+
+
+def test_weighted_share_between_datasets():
+    pool = make_pool()
+    pool.register('electric', 3.0)
+    pool.register('hybrid', 1.0)
+    for dataset in ('electric', 'hybrid'):
+        pool.waiting[dataset] = [(None, None)] * 8
+
+    picks = [pool._next_job()[0] for _ in range(8)]
+
+    assert picks.count('electric') == 6
+    assert picks.count('hybrid') == 2
+
+
+def test_idle_dataset_does_not_block_others():
+    pool = make_pool()
+    pool.register('electric', 3.0)
+    pool.register('hybrid', 1.0)
+    pool.waiting['hybrid'] = [(None, None)] * 3
+
+    assert [pool._next_job()[0] for _ in range(3)] == ['hybrid'] * 3
+
+
+def test_register_rejects_non_positive_weight():
+    pool = make_pool()
+
+    with pytest.raises(ValueError):
+        pool.register('electric', 0)
+
+
+@pytest.mark.parametrize("spec", ["electric:0", "electric:-1", "electric:abc", "unknown"])
+def test_parse_jobs_rejects_invalid_specs(spec):
+    with pytest.raises(SystemExit):
+        main.parse_jobs(argparse.ArgumentParser(), [spec])
+
+
+def test_parse_jobs_weights():
+    jobs = main.parse_jobs(argparse.ArgumentParser(), ["electric:3", "hybrid"])
+
+    assert jobs == [('electric', 3.0), ('hybrid', 1.0)]
+
+
+def test_parse_overrides():
+    overrides = main.parse_overrides(argparse.ArgumentParser(), ["electric=crawled_data/other.xlsx"], '--excel-file')
+
+    assert overrides == {'electric': 'crawled_data/other.xlsx'}
+
+
+@pytest.mark.parametrize("spec", ["electric", "unknown=a.xlsx", "electric="])
+def test_parse_overrides_rejects_invalid_specs(spec):
+    with pytest.raises(SystemExit):
+        main.parse_overrides(argparse.ArgumentParser(), [spec], '--excel-file')
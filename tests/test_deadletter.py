@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+import time
+
+from miit_crawler.deadletter import DeadLetterQueue
+
+
+def test_backoff_grows_exponentially_with_jitter():
+    queue = DeadLetterQueue("unused.json", base_delay=10, max_delay=100)
+
+    for attempts, delay in [(1, 10), (2, 20), (3, 40), (4, 80), (5, 100), (8, 100)]:
+        for _ in range(20):
+            assert delay * 0.5 <= queue.backoff(attempts) < delay * 1.5
+
+
+def test_record_schedules_retry_and_survives_reload(tmp_path):
+    file_path = str(tmp_path / "deadletter.json")
+    queue = DeadLetterQueue(file_path, max_attempts=3, base_delay=60)
+
+    assert queue.record("u1", 1, "TimeoutException: ")
+    entry = queue.pending["u1"]
+    assert entry["attempts"] == 1
+    assert entry["reason"] == "TimeoutException: "
+    assert time.time() + 30 <= entry["next_retry"] <= time.time() + 90
+
+    reloaded = DeadLetterQueue(file_path, max_attempts=3, base_delay=60)
+    assert reloaded.pending == queue.pending
+    assert reloaded.failed == {}
+
+
+def test_due_returns_only_entries_past_retry_time(tmp_path):
+    queue = DeadLetterQueue(str(tmp_path / "deadletter.json"), base_delay=60)
+    queue.record("u1", 1, "CaptchaRecognitionError: 滑块验证失败")
+    queue.record("u2", 2, "CaptchaRecognitionError: 滑块验证失败")
+    queue.pending["u1"]["next_retry"] = time.time() - 1
+
+    assert queue.due() == [("u1", 1)]
+    assert sorted(queue.due(now=time.time() + 1000)) == [("u1", 1), ("u2", 2)]
+    assert queue.next_retry_time() == queue.pending["u1"]["next_retry"]
+
+
+def test_max_attempts_moves_entry_to_failed(tmp_path):
+    file_path = str(tmp_path / "deadletter.json")
+    queue = DeadLetterQueue(file_path, max_attempts=2, base_delay=0)
+
+    assert queue.record("u1", 7, "AccessBannedError: 访问行为被禁止")
+    assert not queue.record("u1", 7, "AccessBannedError: 访问行为被禁止")
+
+    assert queue.pending == {}
+    assert queue.failed == {"u1": {"number": 7, "attempts": 2, "reason": "AccessBannedError: 访问行为被禁止"}}
+    assert queue.due() == []
+    assert queue.next_retry_time() is None
+
+    reloaded = DeadLetterQueue(file_path)
+    assert reloaded.failed == queue.failed
+
+
+def test_remove_drops_pending_entry(tmp_path):
+    file_path = str(tmp_path / "deadletter.json")
+    queue = DeadLetterQueue(file_path)
+    queue.record("u1", 1, "TimeoutException: ")
+
+    queue.remove("u1")
+    queue.remove("missing")
+
+    assert DeadLetterQueue(file_path).pending == {}
+
+
+def test_start_requests_checks_due_retries_at_most_once_per_interval(tmp_path, monkeypatch):
+    import json
+
+    from scrapy.utils.test import get_crawler
+
+    from miit_crawler.spiders.miit_spider import MiitSpider
+
+    urls = [f"https://app.miit-eidc.org.cn/queryCpData?gid={i}&pc=350" for i in range(1000)]
+    url_file = tmp_path / "urls.json"
+    url_file.write_text(json.dumps(urls))
+    crawler = get_crawler(MiitSpider, {'DEADLETTER_CHECK_INTERVAL': 5})
+    spider = MiitSpider.from_crawler(crawler, url_file=str(url_file), excel_file=str(tmp_path / "data.xlsx"))
+    spider.dead_letters.record(urls[0], 1, "TimeoutException: ")
+    spider.dead_letters.pending[urls[0]]["next_retry"] = 0
+
+    calls = []
+    due = spider.dead_letters.due
+    monkeypatch.setattr(spider.dead_letters, 'due', lambda now=None: calls.append(1) or due(now))
+
+    requests = list(spider.start_requests())
+
+    # 第一次检查投递到期重试, 之后的起始请求不再逐条遍历失败队列, 结束时再检查一次
+    assert len(calls) == 2
+    assert requests[0].url == urls[0] and requests[0].dont_filter
+    assert [request.url for request in requests[1:]] == urls[1:]
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def detail_url(batch, index):
+    return f"queryCpData?dataTag=Z&gid=B{batch}N{index}&pc={batch}"
+
+
+class MockListing:
+    """
+    模拟公告列表页: batches 为 批次 -> 每页的详情链接列表
+    页码超出范围时重复返回最后一页, 不存在的批次返回空页
+    """
+
+    def __init__(self, batches):
+        self.batches = batches
+        self.requested = []
+
+    def page(self, batch, page):
+        self.requested.append((batch, page))
+        pages = self.batches.get(batch)
+        if not pages:
+            return []
+        return pages[min(page, len(pages)) - 1]
+
+
+@pytest.fixture
+def listing():
+    mock = MockListing({})
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            links = mock.page(int(query['pc'][0]), int(query['page'][0]))
+            body = "<html><body>" + "".join(f'<a href="{href}">详情</a>' for href in links) + "</body></html>"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(body.encode("utf-8"))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    mock.base_url = f"http://127.0.0.1:{server.server_port}/miitxxgk/gonggao/xxgk/"
+    yield mock
+    server.shutdown()
+
+
+def run_discovery(listing, url_file, state_file):
+    subprocess.run(
+        [
+            sys.executable, "-m", "scrapy", "crawl", "miit_discovery_spider",
+            "-a", f"url_file={url_file}",
+            "-a", f"state_file={state_file}",
+            "-a", f"listing_url={listing.base_url}queryCpList?pc={{batch}}&page={{page}}",
+            "-s", "DOWNLOAD_DELAY=0",
+            "-s", "AUTOTHROTTLE_ENABLED=False",
+            "-s", "LOG_LEVEL=WARNING",
+        ],
+        cwd=PROJECT_DIR,
+        check=True,
+        timeout=60,
+    )
+    with open(url_file) as f:
+        return json.load(f)
+
+
+def test_incremental_discovery(listing, tmp_path):
+    url_file = str(tmp_path / "urls.json")
+    state_file = str(tmp_path / "state.json")
+    existing = [listing.base_url + detail_url(9, 1), listing.base_url + detail_url(1, 2)]
+    with open(url_file, "w") as f:
+        json.dump(existing, f)
+    # 有状态文件时以状态文件为准, 不看 URL 文件中的批次
+    with open(state_file, "w") as f:
+        json.dump({"last_batch": 0}, f)
+
+    listing.batches = {
+        1: [[detail_url(1, 1), detail_url(1, 2)], [detail_url(1, 3)]],
+        2: [[detail_url(2, 1)]],
+    }
+    urls = run_discovery(listing, url_file, state_file)
+
+    # 已有 URL 顺序不变, 新 URL 只追加在末尾且不重复
+    assert urls[:len(existing)] == existing
+    assert urls[len(existing):] == [
+        listing.base_url + detail_url(1, 1),
+        listing.base_url + detail_url(1, 3),
+        listing.base_url + detail_url(2, 1),
+    ]
+    # 超出范围的页码重复返回最后一页时, 批次在下一页结束
+    assert (1, 3) in listing.requested and (1, 4) not in listing.requested
+    with open(state_file) as f:
+        assert json.load(f) == {"last_batch": 2}
+
+    # 第二次运行只抓取新批次
+    listing.requested = []
+    listing.batches[3] = [[detail_url(3, 1), detail_url(3, 2)]]
+    urls_second = run_discovery(listing, url_file, state_file)
+
+    assert urls_second[:len(urls)] == urls
+    assert urls_second[len(urls):] == [
+        listing.base_url + detail_url(3, 1),
+        listing.base_url + detail_url(3, 2),
+    ]
+    assert all(batch >= 3 for batch, _ in listing.requested)
+    with open(state_file) as f:
+        assert json.load(f) == {"last_batch": 3}
+
+
+def test_without_state_file_starts_after_largest_batch_in_url_file(listing, tmp_path):
+    url_file = str(tmp_path / "urls.json")
+    state_file = str(tmp_path / "state.json")
+    existing = [listing.base_url + detail_url(347, 1), listing.base_url + detail_url(351, 1), listing.base_url + detail_url(350, 1)]
+    with open(url_file, "w") as f:
+        json.dump(existing, f)
+
+    listing.batches = {
+        1: [[detail_url(1, 1)]],
+        351: [[detail_url(351, 1), detail_url(351, 2)]],
+        352: [[detail_url(352, 1)]],
+    }
+    urls = run_discovery(listing, url_file, state_file)
+
+    assert urls == existing + [listing.base_url + detail_url(352, 1)]
+    assert all(batch > 351 for batch, _ in listing.requested)
+    with open(state_file) as f:
+        assert json.load(f) == {"last_batch": 352}
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from scrapy.settings import Settings
+from twisted.internet import defer, reactor, task
+
+from miit_crawler.exceptions import AccessBannedError, CaptchaRecognitionError
+from miit_crawler.middlewares import BrowserPool, EgressIdentity, SliderCaptchaSolver
+
+
+def make_pool(strategy='round_robin', count=3, min_interval=0):
+    settings = Settings({
+        'USER_AGENT': 'default-agent',
+        'EGRESS_IDENTITIES': [{'name': f"p{i}", 'proxy': f"http://127.0.0.1:{8081 + i}"} for i in range(count)],
+        'EGRESS_STRATEGY': strategy,
+        'EGRESS_MIN_INTERVAL': min_interval,
+        'EGRESS_BAN_COOLDOWN': 100,
+    })
+    return BrowserPool(settings)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    用假时钟替换 reactor 的定时调度, 不运行 reactor 即可检查调度
+    """
+    clock = task.Clock()
+    monkeypatch.setattr(reactor, 'callLater', clock.callLater, raising=False)
+    monkeypatch.setattr(reactor, 'seconds', clock.seconds, raising=False)
+    return clock
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """
+    记录交给各身份工作线程的任务, 由测试手动完成
+    """
+    started = []
+
+    def fake_run(self, func, *args):
+        d = defer.Deferred()
+        started.append((self, func, args, d))
+        return d
+
+    monkeypatch.setattr(EgressIdentity, 'run', fake_run)
+    return started
+
+
+def test_identities_use_configured_proxy_and_default_user_agent():
+    pool = make_pool(count=2)
+
+    assert [identity.proxy for identity in pool.identities] == ["http://127.0.0.1:8081", "http://127.0.0.1:8082"]
+    assert all(identity.user_agent == 'default-agent' for identity in pool.identities)
+
+
+def test_round_robin_skips_identities_in_cooldown():
+    pool = make_pool()
+    pool.identities[1].cooldown_until = time.time() + 100
+
+    picks = [pool._select_identity()[0].name for _ in range(4)]
+
+    assert picks == ['p0', 'p2', 'p0', 'p2']
+
+
+def test_health_strategy_prefers_successful_identities():
+    pool = make_pool(strategy='health')
+    pool.identities[0].requests, pool.identities[0].successes = 10, 2
+    pool.identities[1].requests, pool.identities[1].successes = 10, 9
+    pool.identities[2].requests, pool.identities[2].successes = 10, 5
+
+    assert pool._select_identity()[0].name == 'p1'
+
+    pool.identities[1].busy = True
+    assert pool._select_identity()[0].name == 'p2'
+
+
+def test_min_interval_and_busy_identities_are_not_selected():
+    pool = make_pool(count=2, min_interval=5)
+    pool.identities[0].mark_used()
+    pool.identities[1].busy = True
+
+    identity, wait = pool._select_identity()
+
+    assert identity is None
+    assert 4 < wait <= 5
+
+    pool.identities[0].busy = True
+    assert pool._select_identity() == (None, None)
+
+
+def test_ban_starts_cooldown_and_resets_profile(tmp_path):
+    identity = EgressIdentity('p0', 'agent', proxy='http://127.0.0.1:8081')
+    browser = FakeBrowser()
+    identity.browser = browser
+    identity.profile_dir = str(tmp_path / 'profile')
+    os.makedirs(identity.profile_dir)
+
+    identity.ban(100)
+
+    assert identity.bans == 1
+    assert identity.available_at(0) >= time.time() + 99
+    assert browser.quit_called
+    assert identity.browser is None
+    assert identity.profile_dir is None
+    assert not os.path.exists(str(tmp_path / 'profile'))
+
+
+def test_all_identities_in_cooldown_schedules_later_dispatch(clock, runs):
+    pool = make_pool(count=2)
+    pool.register('electric')
+    for identity in pool.identities:
+        identity.cooldown_until = time.time() + 100
+
+    pool.submit('electric', lambda identity: None)
+    clock.advance(0)
+
+    assert runs == []
+    calls = clock.getDelayedCalls()
+    assert len(calls) == 1
+    assert 99 < calls[0].getTime() - clock.seconds() <= 100
+    assert len(pool.waiting['electric']) == 1
+
+
+def test_jobs_run_in_parallel_on_separate_identities(clock, runs):
+    pool = make_pool(count=2)
+    pool.register('electric')
+    results = []
+    for _ in range(3):
+        pool.submit('electric', lambda identity: None).addBoth(results.append)
+    clock.advance(0)
+
+    # 两个身份各处理一个页面, 第三个任务等待
+    assert [run[0].name for run in runs] == ['p0', 'p1']
+    assert all(run[2][0] is run[0] for run in runs)
+    assert len(pool.waiting['electric']) == 1
+
+    runs[0][3].callback('page')
+    clock.advance(0)
+
+    assert results == ['page']
+    assert pool.identities[0].successes == 1
+    assert [run[0].name for run in runs] == ['p0', 'p1', 'p0']
+
+
+def test_failed_solve_counts_against_identity_health(clock, runs):
+    pool = make_pool(count=1)
+    pool.register('electric')
+    results = []
+    pool.submit('electric', lambda identity: None).addErrback(results.append)
+    clock.advance(0)
+
+    identity, _, _, d = runs[0]
+    d.errback(CaptchaRecognitionError("滑块验证失败"))
+
+    assert identity.requests == 1
+    assert identity.successes == 0
+    assert identity.health() < 0.5
+    assert not identity.busy
+    assert results[0].check(CaptchaRecognitionError)
+
+
+def test_ban_cools_identity_down_in_its_worker(clock, runs):
+    pool = make_pool(count=1)
+    pool.register('electric')
+    results = []
+    pool.submit('electric', lambda identity: None).addErrback(results.append)
+    clock.advance(0)
+
+    identity, _, _, d = runs[0]
+    d.errback(AccessBannedError("访问行为被禁止"))
+
+    # 在工作线程中执行 ban, 完成前身份保持占用
+    assert runs[1][1] == identity.ban and runs[1][2] == (100,)
+    assert identity.busy
+    assert results[0].check(AccessBannedError)
+
+    runs[1][3].callback(None)
+    assert not identity.busy
+
+
+def test_captcha_image_goes_through_identity_proxy(tmp_path, monkeypatch):
+    """
+    本地代理替身: 记录经过代理的请求并返回图片内容
+    """
+    received = []
+
+    class Proxy(BaseHTTPRequestHandler):
+        def do_GET(self):
+            received.append((self.path, self.headers.get('User-Agent')))
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b'image')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Proxy)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.chdir(tmp_path)
+    try:
+        file_name = SliderCaptchaSolver().download_image(
+            'http://captcha.invalid/bg.png',
+            proxy=f"http://127.0.0.1:{server.server_port}",
+            user_agent='agent-1',
+        )
+    finally:
+        server.shutdown()
+
+    assert received == [('http://captcha.invalid/bg.png', 'agent-1')]
+    with open(file_name, 'rb') as f:
+        assert f.read() == b'image'
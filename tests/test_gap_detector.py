@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+import cv2
+import numpy as np
+import pytest
+
+from miit_crawler import settings
+from miit_crawler.middlewares import OpenCVGapDetector, SliderCaptchaSolver
+
+
+def make_background(seed, width=320, height=160):
+    """
+    生成带纹理的背景图
+    """
+    rng = np.random.default_rng(seed)
+    noise = rng.uniform(0, 255, (height // 4, width // 4, 3)).astype(np.uint8)
+    return cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+
+
+def add_gap(image, x, y, size=44, knobs=('top', 'right')):
+    """
+    在背景图上挖出带凸起的拼图缺口: 区域变暗, 边缘描白
+    """
+    mask = np.zeros(image.shape[:2], np.uint8)
+    cv2.rectangle(mask, (x, y), (x + size, y + size), 255, -1)
+    centers = {
+        'left': (x, y + size // 2),
+        'top': (x + size // 2, y),
+        'right': (x + size, y + size // 2),
+        'bottom': (x + size // 2, y + size),
+    }
+    for knob in knobs:
+        cv2.circle(mask, centers[knob], size // 6, 255, -1)
+    result = image.copy()
+    result[mask > 0] = (result[mask > 0] * 0.4).astype(np.uint8)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    cv2.drawContours(result, contours, -1, (230, 230, 230), 2)
+    return result
+
+
+class FakeRecognizer:
+    def __init__(self):
+        self.calls = 0
+
+    def identify_gap(self, source):
+        self.calls += 1
+        return [1, 2, 3, 4], 0.9
+
+
+def make_solver():
+    solver = SliderCaptchaSolver(min_confidence=settings.CAPTCHA_CV_MIN_CONFIDENCE)
+    solver._recognizer = FakeRecognizer()
+    return solver
+
+
+@pytest.mark.parametrize("seed,gap_x,knobs", [
+    (0, 90, ('top', 'right')),
+    (1, 140, ('top', 'right')),
+    (2, 200, ('right', 'bottom')),
+    (3, 240, ()),
+    (4, 90, ('left', 'top')),
+    (5, 160, ('left', 'bottom')),
+    (6, 210, ('left',)),
+])
+def test_detects_gap_position(seed, gap_x, knobs):
+    image = add_gap(make_background(seed), gap_x, 60, knobs=knobs)
+    # 与识别模型一致, 期望的左边界为整个拼图形状的左边界
+    shape_x = gap_x - 44 // 6 if 'left' in knobs else gap_x
+
+    box, confidence = OpenCVGapDetector().detect_image(image)
+
+    assert abs(box[0] - shape_x) <= 4
+    assert confidence >= settings.CAPTCHA_CV_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("image", [
+    np.full((160, 320, 3), 128, np.uint8),
+    make_background(5),
+    add_gap(add_gap(make_background(6), 60, 40), 220, 60),
+], ids=["flat", "no_gap", "two_gaps"])
+def test_ambiguous_image_has_low_confidence(image):
+    _, confidence = OpenCVGapDetector().detect_image(image)
+
+    assert confidence < settings.CAPTCHA_CV_MIN_CONFIDENCE
+
+
+def test_confident_detection_skips_recognizer(tmp_path):
+    image_file = str(tmp_path / "bg.png")
+    cv2.imwrite(image_file, add_gap(make_background(0), 150, 50))
+    solver = make_solver()
+
+    box = solver.detect_puzzle_piece_boundary(image_file)
+
+    assert abs(box[0] - 150) <= 4
+    assert solver._recognizer.calls == 0
+
+
+def test_low_confidence_falls_back_to_recognizer(tmp_path):
+    image_file = str(tmp_path / "bg.png")
+    cv2.imwrite(image_file, make_background(5))
+    solver = make_solver()
+
+    box = solver.detect_puzzle_piece_boundary(image_file)
+
+    assert box == [1, 2, 3, 4]
+    assert solver._recognizer.calls == 1
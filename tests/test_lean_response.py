@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+import json
+
+import lxml.html
+import pytest
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.test import get_crawler
+from selenium.webdriver.remote.webelement import WebElement
+
+from miit_crawler.exceptions import AccessBannedError, CaptchaRecognitionError
+from miit_crawler.middlewares import BrowserPool, EgressIdentity, SeleniumMiddleware
+from miit_crawler.spiders.miit_spider import MiitSpider
+
+DETAIL_URL = "https://app.miit-eidc.org.cn/miitxxgk/gonggao/xxgk/queryCpData?dataTag=Z&gid=Y5119378&pc=350"
+
+FIELDS = [
+    ("产品号", "Y5119378"), ("批次", "350"), ("发布日期", "2021-12-01"),
+    ("企业名称", "某某汽车有限公司"), ("产品商标", "某某"), ("生产地址", "某省某市"),
+    ("车辆型号", "ABC6480ST6HEV"), ("车辆名称", "插电式混合动力多用途乘用车"),
+    ("底盘ID", ""), ("底盘型号及企业", ""), ("车辆识别代号", "LABC1234567890"),
+    ("燃料种类", "汽油/电"), ("油耗", "1.6"), ("排放依据标准", "GB18352.6-2016国Ⅵ"),
+    ("发动机生产企业", "某某动力"), ("发动机型号", "XYZ15"), ("排量", "1498"),
+    ("反光标识企业", "某某反光"), ("其它", "无"), ("停产日期", ""), ("停售日期", ""),
+]
+
+# 完整页面: 验证码残留节点, 脚本, 嵌套表格, 表格内外的图片
+FULL_PAGE = """
+<html><head><title>车辆详情</title><script>var yidun = {config: "x"};</script></head>
+<body>
+<div class="yidun"><div class="yidun_slider"></div><img class="yidun_bg-img" src="https://captcha.invalid/bg.png"></div>
+<script src="captcha.js"></script>
+<table class="detail">
+%s
+<tr><td>图片</td><td><table><tr><td><img src="getPic?id=1" alt="1"></td></tr></table></td></tr>
+</table>
+<div class="pics"><img src="getPic?id=2" alt="2"><img src="logo.png" alt="logo"></div>
+</body></html>
+""" % "\n".join(f"<tr><td>{label}</td><td><span>{value}</span></td></tr>" for label, value in FIELDS)
+
+
+def lean_fragment(page):
+    """
+    与 SeleniumMiddleware._lean_page_source 中脚本相同的选取规则:
+    最外层表格, 以及不在表格中的 getPic 图片
+    """
+    tree = lxml.html.fromstring(page)
+    parts = [table for table in tree.iter("table") if not list(table.iterancestors("table"))]
+    parts += [img for img in tree.xpath('//img[starts-with(@src, "getPic")]') if not list(img.iterancestors("table"))]
+    return "<html><body>" + "".join(lxml.html.tostring(part, encoding="unicode") for part in parts) + "</body></html>"
+
+
+@pytest.fixture
+def spider(tmp_path):
+    url_file = tmp_path / "urls.json"
+    url_file.write_text(json.dumps([DETAIL_URL]))
+    crawler = get_crawler(MiitSpider)
+    return MiitSpider.from_crawler(crawler, url_file=str(url_file), excel_file=str(tmp_path / "data.xlsx"))
+
+
+def parse_item(spider, body):
+    request = Request(DETAIL_URL, meta={'number': 1})
+    response = HtmlResponse(url=DETAIL_URL, body=body, encoding='utf-8', request=request)
+    return dict(next(iter(spider.parse(response))))
+
+
+def test_lean_fragment_parses_to_same_item(spider):
+    fragment = lean_fragment(FULL_PAGE)
+    assert "yidun" not in fragment and "<script" not in fragment
+
+    full_item = parse_item(spider, FULL_PAGE)
+    lean_item = parse_item(spider, fragment)
+
+    assert lean_item == full_item
+    assert full_item['product_id'] == "Y5119378"
+    assert full_item['image_urls'] == [
+        "https://app.miit-eidc.org.cn/miitxxgk/gonggao/xxgk/getPic?id=1",
+        "https://app.miit-eidc.org.cn/miitxxgk/gonggao/xxgk/getPic?id=2",
+    ]
+
+
+class FakeElement(WebElement):
+    @property
+    def size(self):
+        return {'width': 320, 'height': 160}
+
+    def get_attribute(self, name):
+        return "https://captcha.invalid/bg.png"
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        pass
+
+
+class FakeBrowser:
+    """
+    模拟验证通过后的浏览器; 精简脚本返回 None 时应回退到 page_source
+    """
+
+    def __init__(self, page_source):
+        self.page_source = page_source
+        self.current_url = DETAIL_URL
+        self.scripts = []
+
+    def get(self, url):
+        pass
+
+    def find_element(self, by, value):
+        return FakeElement(self, value)
+
+    def execute(self, command, params=None):
+        return {'value': None}
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        return None
+
+
+class FakeSolver:
+    def get_slide_distance(self, bg_img_url, display_width, proxy=None, user_agent=None):
+        return 100
+
+
+@pytest.fixture
+def middleware():
+    crawler = get_crawler(MiitSpider, {'LEAN_RESPONSE': True, 'USER_AGENT': 'test-agent'})
+    middleware = SeleniumMiddleware.from_crawler(crawler)
+    middleware.pool.captcha_solver = FakeSolver()
+    yield middleware
+    BrowserPool._shared = None
+
+
+def render(middleware, browser):
+    identity = EgressIdentity('p0', 'test-agent')
+    identity.browser = browser
+    return middleware._render(Request(DETAIL_URL, meta={'number': 1}), identity)
+
+
+def test_render_falls_back_to_full_page_when_lean_script_returns_none(middleware):
+    browser = FakeBrowser(FULL_PAGE)
+
+    response = render(middleware, browser)
+
+    assert any("querySelectorAll('table')" in script for script in browser.scripts)
+    assert response.text == FULL_PAGE
+
+
+def test_render_fallback_still_detects_ban(middleware):
+    browser = FakeBrowser("<html><body>访问行为被禁止</body></html>")
+
+    with pytest.raises(AccessBannedError):
+        render(middleware, browser)
+
+
+def test_render_raises_when_still_on_verification_page(middleware):
+    browser = FakeBrowser("<html><body>访问行为验证<div class=\"yidun_slider\"></div></body></html>")
+
+    with pytest.raises(CaptchaRecognitionError):
+        render(middleware, browser)